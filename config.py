@@ -21,6 +21,14 @@ INPUT_EXCEL_PATH = r""
 # Buyer Emails table name in DB
 BUYER_EMAIL_TABLE = "BuyerEmails"
 
+# Distributed work queue (shared by the coordinator and scraper workers)
+WORK_QUEUE_TABLE = "ScrapeWorkQueue"
+WORK_RUN_TABLE = "ScrapeWorkRuns"
+WORK_BATCH_SIZE = 50
+WORK_LEASE_SECONDS = 900
+WORK_MAX_ATTEMPTS = 3
+WORK_IDLE_SLEEP_SECONDS = 30
+
 # Search URLs
 PRAKTIS_SEARCH_URL = "https://praktis.bg/catalogsearch/result/?q={}"
 PRAKTIKER_SEARCH_URL = "https://praktiker.bg/search/{}"
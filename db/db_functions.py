@@ -3,11 +3,14 @@
 import pyodbc
 from datetime import datetime
 from config import DB_CONNECTION_STRING
+from utils.helpers import parse_price, price_decimal
 
 def upsert_data_to_db(data, table_name="ProductDetails"):
     """
-    Upserts product records into the SQL Server table.
+    Upserts ProductRecord objects into the SQL Server table.
     Returns a changes dictionary with keys "new_items" and "price_changes".
+    Stored prices are parsed before comparison, so tables written with the older
+    text representation ("12,99", "None") do not report spurious price changes.
     """
     changes = {"new_items": [], "price_changes": []}
     try:
@@ -21,19 +24,23 @@ def upsert_data_to_db(data, table_name="ProductDetails"):
                 [Praktiker Code] NVARCHAR(255),
                 [Praktis Name] NVARCHAR(255),
                 [Praktiker Name] NVARCHAR(255),
-                [Praktis Regular Price] NVARCHAR(255),
-                [Praktiker Regular Price] NVARCHAR(255),
-                [Praktis Promo Price] NVARCHAR(255),
-                [Praktiker Promo Price] NVARCHAR(255),
+                [Praktis Regular Price] DECIMAL(18, 2),
+                [Praktiker Regular Price] DECIMAL(18, 2),
+                [Praktis Promo Price] DECIMAL(18, 2),
+                [Praktiker Promo Price] DECIMAL(18, 2),
                 [RunTimestamp] DATETIME
             )
         END
         """
         cursor.execute(create_table_sql)
         conn.commit()
-        for row in data:
-            praktis_code = str(row.get("Praktis Code", ""))
-            praktiker_code = str(row.get("Praktiker Code", ""))
+        for rec in data:
+            praktis_code = rec.praktis_code
+            praktiker_code = rec.praktiker_code
+            new_praktis_price = price_decimal(rec.praktis_regular_price)
+            new_praktiker_price = price_decimal(rec.praktiker_regular_price)
+            new_praktis_promo = price_decimal(rec.praktis_promo_price)
+            new_praktiker_promo = price_decimal(rec.praktiker_promo_price)
             current_timestamp = datetime.now()
             select_sql = f"""
                 SELECT [Praktis Regular Price], [Praktiker Regular Price],
@@ -54,24 +61,20 @@ def upsert_data_to_db(data, table_name="ProductDetails"):
                 cursor.execute(insert_sql,
                     praktis_code,
                     praktiker_code,
-                    str(row.get("Praktis Name", "")),
-                    str(row.get("Praktiker Name", "")),
-                    str(row.get("Praktis Regular Price", "")),
-                    str(row.get("Praktiker Regular Price", "")),
-                    str(row.get("Praktis Promo Price", "")),
-                    str(row.get("Praktiker Promo Price", "")),
+                    rec.praktis_name,
+                    rec.praktiker_name,
+                    new_praktis_price,
+                    new_praktiker_price,
+                    new_praktis_promo,
+                    new_praktiker_promo,
                     current_timestamp
                 )
                 changes["new_items"].append({"Praktis Code": praktis_code, "Praktiker Code": praktiker_code})
             else:
-                old_praktis_price = str(existing[0])
-                old_praktiker_price = str(existing[1])
-                old_praktis_promo = str(existing[2])
-                old_praktiker_promo = str(existing[3])
-                new_praktis_price = str(row.get("Praktis Regular Price", ""))
-                new_praktiker_price = str(row.get("Praktiker Regular Price", ""))
-                new_praktis_promo = str(row.get("Praktis Promo Price", ""))
-                new_praktiker_promo = str(row.get("Praktiker Promo Price", ""))
+                old_praktis_price = price_decimal(existing[0])
+                old_praktiker_price = price_decimal(existing[1])
+                old_praktis_promo = price_decimal(existing[2])
+                old_praktiker_promo = price_decimal(existing[3])
                 if (old_praktis_price != new_praktis_price or
                     old_praktiker_price != new_praktiker_price or
                     old_praktis_promo != new_praktis_promo or
@@ -79,10 +82,10 @@ def upsert_data_to_db(data, table_name="ProductDetails"):
                     changes["price_changes"].append({
                         "code": praktis_code,
                         "praktiker_code": praktiker_code,
-                        "praktis_old_price": old_praktis_price,
-                        "praktis_new_price": new_praktis_price,
-                        "praktiker_old_price": old_praktiker_price,
-                        "praktiker_new_price": new_praktiker_price
+                        "praktis_old_price": parse_price(old_praktis_price),
+                        "praktis_new_price": rec.praktis_regular_price,
+                        "praktiker_old_price": parse_price(old_praktiker_price),
+                        "praktiker_new_price": rec.praktiker_regular_price
                     })
                 update_sql = f"""
                     UPDATE [{table_name}]
@@ -98,8 +101,8 @@ def upsert_data_to_db(data, table_name="ProductDetails"):
                 """
                 cursor.execute(update_sql,
                     praktiker_code,
-                    str(row.get("Praktis Name", "")),
-                    str(row.get("Praktiker Name", "")),
+                    rec.praktis_name,
+                    rec.praktiker_name,
                     new_praktis_price,
                     new_praktiker_price,
                     new_praktis_promo,
@@ -1,6 +1,7 @@
 # main.py
 
 import os
+import argparse
 from datetime import datetime
 from db import db_functions
 from mailer import email_functions
@@ -16,19 +17,19 @@ from config import (
     BUYER_EMAIL_TABLE,
     PRAKTIS_SEARCH_URL,
     PRAKTIKER_SEARCH_URL,
+    WORK_BATCH_SIZE,
+    WORK_LEASE_SECONDS,
 )
 
 
-def main():
-    # Process the input Excel file and get product data and buyer mappings.
-    product_data, buyer_mappings = excel_utils.process_excel_and_split_files(INPUT_EXCEL_PATH)
-
+def diff_and_notify(product_data):
+    """
+    Upserts the scraped product data, then emails every buyer whose products
+    changed a buyer-specific Excel report. Buyer mappings must already be stored.
+    """
     # Upsert product data into the ProductDetails table.
     changes = db_functions.upsert_data_to_db(product_data, table_name="ProductDetails")
 
-    # Upsert buyer mappings into the ProductBuyers table.
-    db_functions.upsert_product_buyers(buyer_mappings, table_name="ProductBuyers")
-
     # Get mapping from product pair to buyer codes.
     buyer_mapping_dict = db_functions.get_product_buyers(table_name="ProductBuyers")
 
@@ -83,5 +84,81 @@ def main():
             print(f"No updates for Buyer Code {buyer_code}. No email sent.")
 
 
+def get_work_queue(args, run_id=None):
+    if args.queue_file:
+        from workqueue.file_queue import FileWorkQueue
+        return FileWorkQueue(args.queue_file, run_id)
+    from workqueue.db_queue import DbWorkQueue
+    return DbWorkQueue(run_id)
+
+
+def enqueue_run(args):
+    """
+    Coordinator: reads the input Excel file, stores the buyer mappings and queues
+    every unique product pair for the scraper workers.
+    """
+    product_pairs, buyer_mappings = excel_utils.read_input_excel(INPUT_EXCEL_PATH)
+    db_functions.upsert_product_buyers(buyer_mappings, table_name="ProductBuyers")
+    run_id = args.run_id or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    queue = get_work_queue(args, run_id)
+    try:
+        added = queue.enqueue(product_pairs)
+    except ValueError as e:
+        print(f"Could not enqueue run {run_id}: {e}")
+        return
+    print(f"Queued {added} product pairs for run {run_id}.")
+
+
+def run_queue_worker(args):
+    """
+    Worker: scrapes batches from the queue; the worker that finishes the run last
+    runs the diff-and-notify stage.
+    """
+    from workqueue.worker import run_worker
+    run_id = args.run_id
+    if not args.queue_file and not run_id:
+        from workqueue.db_queue import get_latest_open_run_id
+        run_id = get_latest_open_run_id()
+        if not run_id:
+            print("No open run found in the work queue.")
+            return
+    queue = get_work_queue(args, run_id)
+    if args.queue_file:
+        try:
+            queue.is_finalized()
+        except ValueError:
+            # The file holds no run, or a different one than --run-id.
+            print("No open run found in the work queue.")
+            return
+    run_worker(queue, diff_and_notify, worker_id=args.worker_id,
+               batch_size=args.batch_size, lease_seconds=args.lease_seconds)
+
+
+def main():
+    # Process the input Excel file and get product data and buyer mappings.
+    product_data, buyer_mappings = excel_utils.process_excel_and_split_files(INPUT_EXCEL_PATH)
+
+    # Upsert buyer mappings into the ProductBuyers table.
+    db_functions.upsert_product_buyers(buyer_mappings, table_name="ProductBuyers")
+
+    diff_and_notify(product_data)
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Praktis / Praktiker price comparison.")
+    parser.add_argument("mode", nargs="?", default="run", choices=["run", "enqueue", "worker"],
+                        help="run: single process (default); enqueue: queue the catalog for workers; "
+                             "worker: scrape queued items")
+    parser.add_argument("--run-id", help="Work queue run to enqueue into / work on "
+                                         "(default: new timestamped run / latest open run)")
+    parser.add_argument("--queue-file", help="Use a local file-backed queue instead of the database")
+    parser.add_argument("--worker-id", help="Lease owner name (default: hostname-pid)")
+    parser.add_argument("--batch-size", type=int, default=WORK_BATCH_SIZE)
+    parser.add_argument("--lease-seconds", type=int, default=WORK_LEASE_SECONDS)
+    args = parser.parse_args()
+    if args.mode == "enqueue":
+        enqueue_run(args)
+    elif args.mode == "worker":
+        run_queue_worker(args)
+    else:
+        main()
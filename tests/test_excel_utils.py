@@ -0,0 +1,37 @@
+# tests/test_excel_utils.py
+
+from utils.excel_utils import format_email_body_table_html, filter_product_data_by_buyer
+from utils.product_record import ProductRecord
+
+
+def make_record(code, praktis_price, praktiker_price):
+    return ProductRecord(code, f"P{code}", f"Name {code}", f"Other {code}", praktis_price, praktiker_price, None, None)
+
+
+def test_email_body_handles_none_prices():
+    records = [make_record("1", None, 12.0), make_record("2", 10.0, None)]
+    changes = {
+        "price_changes": [{
+            "code": "1", "praktiker_code": "P1",
+            "praktis_old_price": None, "praktis_new_price": None,
+            "praktiker_old_price": 11.0, "praktiker_new_price": 12.0,
+        }],
+        "new_items": [{"Praktis Code": "2", "Praktiker Code": "P2"}],
+    }
+    html = format_email_body_table_html(changes, records)
+    assert "Name 1" in html and "Name 2" in html
+    assert "+12.00" in html
+    assert "-10.00" in html
+    assert "None" not in html
+
+
+def test_email_body_unknown_product_shows_na():
+    changes = {"price_changes": [], "new_items": [{"Praktis Code": "9", "Praktiker Code": "P9"}]}
+    assert "N/A" in format_email_body_table_html(changes, [])
+
+
+def test_filter_product_data_by_buyer():
+    records = [make_record("1", 1.0, 1.0), make_record("2", 2.0, 2.0)]
+    mapping = {("1", "P1"): ["B1"], ("2", "P2"): ["B2", "B1"]}
+    assert [rec.praktis_code for rec in filter_product_data_by_buyer(records, "B2", mapping)] == ["2"]
+    assert len(filter_product_data_by_buyer(records, "B1", mapping)) == 2
@@ -0,0 +1,225 @@
+# tests/test_file_queue.py
+
+import os
+import threading
+import time
+import pytest
+from utils.product_record import ProductRecord
+from workqueue import worker
+from workqueue.file_queue import FileWorkQueue
+
+
+def make_pairs(count):
+    return [{"Praktis Code": f"{i:03d}", "Praktiker Code": f"P{i:03d}"} for i in range(count)]
+
+
+def fake_record(pair):
+    return ProductRecord(pair["Praktis Code"], pair["Praktiker Code"], "name", "name", 10.0, 11.0, None, None)
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.json")
+
+
+@pytest.fixture
+def stub_scraper(monkeypatch):
+    """
+    Replaces scraping with a stub; pairs whose Praktis Code is in `broken` never scrape.
+    """
+    broken = set()
+    calls = []
+
+    def scrape(pairs):
+        calls.append(list(pairs))
+        return sorted((fake_record(p) for p in pairs if p["Praktis Code"] not in broken), key=lambda r: r.key)
+
+    monkeypatch.setattr(worker, "scrape_product_pairs", scrape)
+    return broken, calls
+
+
+def test_two_workers_drain_queue_and_finalize_once(queue_path, stub_scraper):
+    FileWorkQueue(queue_path, "run-1").enqueue(make_pairs(30))
+    drained = []
+    threads = [
+        threading.Thread(target=worker.run_worker,
+                         args=(FileWorkQueue(queue_path), drained.append),
+                         kwargs={"worker_id": f"w{i}", "batch_size": 4, "idle_sleep": 0.01})
+        for i in range(2)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+
+    assert len(drained) == 1
+    assert [rec.key for rec in drained[0]] == [(p["Praktis Code"], p["Praktiker Code"]) for p in make_pairs(30)]
+    queue = FileWorkQueue(queue_path)
+    assert queue.remaining() == 0
+    assert queue.is_finalized()
+    assert not queue.claim_finalize("late", 60)
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_result_discarded(queue_path):
+    queue = FileWorkQueue(queue_path, "run-1")
+    queue.enqueue(make_pairs(3))
+    stale = queue.claim_batch("dead", 10, lease_seconds=-1)
+    assert len(stale) == 3
+
+    reclaimed = queue.claim_batch("alive", 10, lease_seconds=60)
+    assert reclaimed == stale
+    assert queue.complete("dead", [fake_record(p).to_dict() for p in stale]) == 0
+    assert queue.complete("alive", [fake_record(p).to_dict() for p in reclaimed]) == 3
+    assert queue.remaining() == 0
+
+
+def test_unexpired_lease_is_not_handed_out_again(queue_path):
+    queue = FileWorkQueue(queue_path, "run-1")
+    queue.enqueue(make_pairs(2))
+    assert len(queue.claim_batch("a", 10, lease_seconds=60)) == 2
+    assert queue.claim_batch("b", 10, lease_seconds=60) == []
+    assert queue.remaining() == 2
+
+
+def test_item_failing_every_attempt_does_not_block_finalize(queue_path, stub_scraper):
+    broken, calls = stub_scraper
+    broken.add("001")
+    FileWorkQueue(queue_path, "run-1", max_attempts=2).enqueue(make_pairs(3))
+    drained = []
+    worker.run_worker(FileWorkQueue(queue_path, max_attempts=2), drained.append,
+                      worker_id="w", batch_size=10, idle_sleep=0.01)
+
+    assert len(calls) == 2
+    assert len(drained) == 1
+    assert [rec.praktis_code for rec in drained[0]] == ["000", "002"]
+
+
+def test_expired_lease_at_max_attempts_is_marked_failed(queue_path):
+    queue = FileWorkQueue(queue_path, "run-1", max_attempts=1)
+    queue.enqueue(make_pairs(1))
+    queue.claim_batch("dead", 10, lease_seconds=-1)
+    assert queue.claim_batch("alive", 10, lease_seconds=60) == []
+    assert queue.remaining() == 0
+
+
+def test_final_stage_claim_can_be_taken_over_after_expiry(queue_path):
+    queue = FileWorkQueue(queue_path, "run-1")
+    queue.enqueue(make_pairs(1))
+    pairs = queue.claim_batch("w", 10, lease_seconds=60)
+    assert not queue.claim_finalize("a", 60)
+    queue.complete("w", [fake_record(p).to_dict() for p in pairs])
+
+    assert queue.claim_finalize("crashed", lease_seconds=-1)
+    assert not queue.is_finalized()
+    assert queue.claim_finalize("b", lease_seconds=60)
+    assert not queue.claim_finalize("c", lease_seconds=60)
+    assert not queue.mark_finalized("crashed")
+    assert queue.mark_finalized("b")
+    assert queue.is_finalized()
+
+
+def test_worker_waits_for_final_stage_held_by_another_worker(queue_path, stub_scraper):
+    queue = FileWorkQueue(queue_path, "run-1")
+    queue.enqueue(make_pairs(1))
+    queue.complete("w", [fake_record(p).to_dict() for p in queue.claim_batch("w", 10, 60)])
+    assert queue.claim_finalize("crashed", lease_seconds=0.2)
+
+    drained = []
+    worker.run_worker(FileWorkQueue(queue_path), drained.append, worker_id="b", idle_sleep=0.05)
+    assert len(drained) == 1
+    assert queue.is_finalized()
+
+
+def test_enqueue_into_finalized_run_is_refused(queue_path):
+    queue = FileWorkQueue(queue_path, "run-1")
+    queue.enqueue(make_pairs(1))
+    queue.complete("w", [fake_record(p).to_dict() for p in queue.claim_batch("w", 10, 60)])
+    assert queue.claim_finalize("w", 60)
+    assert queue.mark_finalized("w")
+
+    with pytest.raises(ValueError):
+        queue.enqueue(make_pairs(2))
+
+
+def test_enqueue_new_run_replaces_finalized_run(queue_path):
+    first = FileWorkQueue(queue_path, "run-1")
+    first.enqueue(make_pairs(1))
+    first.complete("w", [fake_record(p).to_dict() for p in first.claim_batch("w", 10, 60)])
+    first.claim_finalize("w", 60)
+    first.mark_finalized("w")
+
+    second = FileWorkQueue(queue_path, "run-2")
+    assert second.enqueue(make_pairs(2)) == 2
+    assert second.remaining() == 2
+    assert not second.is_finalized()
+    assert second.get_results() == []
+    with pytest.raises(ValueError):
+        first.remaining()
+
+
+def test_enqueue_over_run_in_progress_is_refused(queue_path):
+    FileWorkQueue(queue_path, "run-1").enqueue(make_pairs(1))
+    with pytest.raises(ValueError):
+        FileWorkQueue(queue_path, "run-2").enqueue(make_pairs(1))
+
+
+def test_read_only_calls_do_not_rewrite_file(queue_path):
+    queue = FileWorkQueue(queue_path, "run-1")
+    queue.enqueue(make_pairs(2))
+    before = os.stat(queue_path).st_mtime_ns
+    queue.remaining()
+    queue.get_results()
+    queue.is_finalized()
+    assert os.stat(queue_path).st_mtime_ns == before
+
+
+def test_renew_extends_only_own_leases(queue_path):
+    queue = FileWorkQueue(queue_path, "run-1")
+    queue.enqueue(make_pairs(2))
+    pairs = queue.claim_batch("a", 10, lease_seconds=-1)
+    assert queue.renew("b", pairs, 60) == 0
+    assert queue.renew("a", pairs, 60) == 2
+    assert queue.claim_batch("b", 10, 60) == []
+
+
+def test_slow_batch_keeps_its_lease(queue_path, monkeypatch):
+    def slow_scrape(pairs):
+        time.sleep(1.0)
+        return [fake_record(p) for p in pairs]
+
+    monkeypatch.setattr(worker, "scrape_product_pairs", slow_scrape)
+    FileWorkQueue(queue_path, "run-1").enqueue(make_pairs(3))
+    drained = []
+    thread = threading.Thread(target=worker.run_worker,
+                              args=(FileWorkQueue(queue_path), drained.append),
+                              kwargs={"worker_id": "slow", "lease_seconds": 0.3, "idle_sleep": 0.01})
+    thread.start()
+    time.sleep(0.6)
+    assert FileWorkQueue(queue_path).claim_batch("other", 10, 60) == []
+    thread.join(timeout=30)
+
+    assert len(drained) == 1
+    assert len(drained[0]) == 3
+
+
+def test_slow_final_stage_keeps_its_claim(queue_path, stub_scraper):
+    FileWorkQueue(queue_path, "run-1").enqueue(make_pairs(1))
+    other_claimed = []
+
+    def slow_drain(records):
+        time.sleep(0.6)
+        other_claimed.append(FileWorkQueue(queue_path).claim_finalize("other", 60))
+
+    worker.run_worker(FileWorkQueue(queue_path), slow_drain, worker_id="w", lease_seconds=0.3, idle_sleep=0.01)
+    assert other_claimed == [False]
+    assert FileWorkQueue(queue_path).is_finalized()
+
+
+def test_failed_items_are_counted(queue_path, stub_scraper, capsys):
+    broken, _ = stub_scraper
+    broken.add("000")
+    FileWorkQueue(queue_path, "run-1", max_attempts=1).enqueue(make_pairs(2))
+    worker.run_worker(FileWorkQueue(queue_path, max_attempts=1), lambda records: None,
+                      worker_id="w", idle_sleep=0.01)
+    assert FileWorkQueue(queue_path).failed_count() == 1
+    assert "1 items failed after 1 attempts" in capsys.readouterr().out
@@ -0,0 +1,46 @@
+# tests/test_helpers.py
+
+from decimal import Decimal
+import pytest
+from utils.helpers import parse_price, price_decimal
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("12.99", 12.99),
+    ("12,99", 12.99),
+    ("1 400,00", 1400.0),
+    ("1.400,00", 1400.0),
+    ("1.400.50", 1400.5),
+    (" 7 ", 7.0),
+    (12.5, 12.5),
+    (Decimal("3.10"), 3.1),
+])
+def test_parse_price(value, expected):
+    assert parse_price(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "   ", "N/A", "n/a", "None"])
+def test_parse_price_missing_values(value, capsys):
+    assert parse_price(value) is None
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("value", ["abc", "nan", "inf", "-inf", float("nan"), Decimal("NaN")])
+def test_parse_price_rejects_and_logs_bad_values(value, capsys):
+    assert parse_price(value) is None
+    assert "Could not parse price" in capsys.readouterr().out
+
+
+def test_price_decimal_rounds_to_two_places():
+    assert price_decimal(12.999) == Decimal("13.00")
+    assert price_decimal("1 400,5") == Decimal("1400.50")
+    assert str(price_decimal(0.1 + 0.2)) == "0.30"
+
+
+def test_price_decimal_matches_legacy_text_values():
+    # Legacy NVARCHAR columns hold the scraped text; it must compare equal to the typed price.
+    assert price_decimal("12,99") == price_decimal(12.99)
+    assert price_decimal(Decimal("12.99")) == price_decimal(12.99)
+    assert price_decimal("None") == price_decimal(None) is None
+    assert price_decimal("N/A") is None
+    assert price_decimal("nan") is None
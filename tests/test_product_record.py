@@ -0,0 +1,39 @@
+# tests/test_product_record.py
+
+import json
+from utils.product_record import FIELD_LABELS, ProductRecord, records_to_columns
+
+
+def make_record(code="1", regular=10.5, promo=None):
+    return ProductRecord(code, f"P{code}", f"Praktis {code}", f"Praktiker {code}", regular, 11.0, promo, None)
+
+
+def test_from_scraped_parses_prices():
+    rec = ProductRecord.from_scraped(
+        {"Praktis Code": 1, "Praktiker Code": 2},
+        {"name": "A", "regular_price": "1 400,50", "promo_price": None},
+        {"name": "N/A", "regular_price": "12.99", "promo_price": "None"},
+    )
+    assert rec == ProductRecord("1", "2", "A", "N/A", 1400.5, 12.99, None, None)
+    assert rec.key == ("1", "2")
+
+
+def test_to_dict_from_dict_round_trip_through_json():
+    rec = make_record(promo=9.99)
+    data = json.loads(json.dumps(rec.to_dict()))
+    assert list(data) == [label for _, label in FIELD_LABELS]
+    assert ProductRecord.from_dict(data) == rec
+
+
+def test_record_has_no_instance_dict():
+    assert not hasattr(make_record(), "__dict__")
+
+
+def test_records_to_columns_keeps_column_order():
+    columns = records_to_columns([make_record("1"), make_record("2", regular=None)])
+    assert list(columns) == [
+        "Praktis Code", "Praktiker Code", "Praktis Name", "Praktiker Name",
+        "Praktis Regular Price", "Praktiker Regular Price", "Praktis Promo Price", "Praktiker Promo Price",
+    ]
+    assert columns["Praktis Code"] == ["1", "2"]
+    assert columns["Praktis Regular Price"] == [10.5, None]
@@ -5,59 +5,71 @@ import time
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.helpers import safe_float
+from utils.product_record import ProductRecord, records_to_columns
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment
 from datetime import datetime
 from config import PRAKTIS_SEARCH_URL, PRAKTIKER_SEARCH_URL
 
+def read_input_excel(input_file):
+    """
+    Reads the input Excel file (with three columns: Praktis Code, Praktiker Code, Buyer Code)
+    and returns:
+      - product_pairs: a list of dictionaries for each unique (Praktis Code, Praktiker Code) pair
+      - buyer_mappings: a list of dictionaries mapping (Praktis Code, Praktiker Code) to Buyer Code
+    """
+    df = pd.read_excel(input_file, engine="odf")
+    df_sorted = df.sort_values(by=df.columns[0])
+    rows = df_sorted.values.tolist()
+    buyer_mappings = []
+    unique_pairs = {}
+    for row in rows:
+        praktis_code = str(row[0])
+        praktiker_code = str(row[1])
+        buyer_code = str(row[2])
+        buyer_mappings.append({
+            "Praktis Code": praktis_code,
+            "Praktiker Code": praktiker_code,
+            "Buyer Code": buyer_code
+        })
+        key = (praktis_code, praktiker_code)
+        if key not in unique_pairs:
+            unique_pairs[key] = {"Praktis Code": praktis_code, "Praktiker Code": praktiker_code}
+    return list(unique_pairs.values()), buyer_mappings
+
+def scrape_product_pairs(product_pairs, max_workers=5):
+    """
+    Fetches product data concurrently for the given product pairs and returns
+    a list of ProductRecord objects sorted by (Praktis Code, Praktiker Code).
+    Pairs that fail to scrape are reported and left out of the result.
+    """
+    results = []
+    from scraping.scraping_functions import fetch_product_data_praktis, fetch_product_data_praktiker
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_product_data_praktis, pair["Praktis Code"]): pair for pair in product_pairs}
+        for future in as_completed(futures):
+            pair = futures[future]
+            try:
+                praktis_data = future.result()
+                praktiker_data = fetch_product_data_praktiker(pair["Praktiker Code"])
+                results.append(ProductRecord.from_scraped(pair, praktis_data, praktiker_data))
+            except Exception as e:
+                print(f"Error scraping {pair['Praktis Code']} / {pair['Praktiker Code']}: {e}")
+    results.sort(key=lambda rec: rec.key)
+    return results
+
 def process_excel_and_split_files(input_file):
     """
     Reads the input Excel file (with three columns: Praktis Code, Praktiker Code, Buyer Code),
     fetches product data concurrently for unique product pairs,
     and returns:
-      - product_data: a list of dictionaries for each unique product pair
+      - product_data: a list of ProductRecord objects for each unique product pair
       - buyer_mappings: a list of dictionaries mapping (Praktis Code, Praktiker Code) to Buyer Code
     """
     try:
-        df = pd.read_excel(input_file, engine="odf")
-        df_sorted = df.sort_values(by=df.columns[0])
-        rows = df_sorted.values.tolist()
-        buyer_mappings = []
-        unique_pairs = {}
-        for row in rows:
-            praktis_code = str(row[0])
-            praktiker_code = str(row[1])
-            buyer_code = str(row[2])
-            buyer_mappings.append({
-                "Praktis Code": praktis_code,
-                "Praktiker Code": praktiker_code,
-                "Buyer Code": buyer_code
-            })
-            key = (praktis_code, praktiker_code)
-            if key not in unique_pairs:
-                unique_pairs[key] = {"Praktis Code": praktis_code, "Praktiker Code": praktiker_code}
-        product_pairs = list(unique_pairs.values())
-        results = []
-        from scraping.scraping_functions import fetch_product_data_praktis, fetch_product_data_praktiker
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {executor.submit(fetch_product_data_praktis, pair["Praktis Code"]): pair for pair in product_pairs}
-            for future in as_completed(futures):
-                pair = futures[future]
-                praktis_data = future.result()
-                praktiker_data = fetch_product_data_praktiker(pair["Praktiker Code"])
-                result = {
-                    "Praktis Code": str(pair["Praktis Code"]),
-                    "Praktiker Code": str(pair["Praktiker Code"]),
-                    "Praktis Name": str(praktis_data["name"]),
-                    "Praktiker Name": str(praktiker_data["name"]),
-                    "Praktis Regular Price": str(praktis_data["regular_price"]),
-                    "Praktiker Regular Price": str(praktiker_data["regular_price"]),
-                    "Praktis Promo Price": str(praktis_data["promo_price"]),
-                    "Praktiker Promo Price": str(praktiker_data["promo_price"]),
-                }
-                results.append(result)
-        results_sorted = sorted(results, key=lambda x: (x["Praktis Code"], x["Praktiker Code"]))
+        product_pairs, buyer_mappings = read_input_excel(input_file)
+        results_sorted = scrape_product_pairs(product_pairs)
         return results_sorted, buyer_mappings
     except Exception as e:
         print(f"An error occurred while processing Excel: {e}")
@@ -82,26 +94,26 @@ def adjust_excel_formatting(file_path):
 
 def write_filtered_excel(file_path, filtered_data, buyer_info):
     """
-    Writes the filtered product data to an Excel file.
+    Writes the filtered product records to an Excel file.
     Adds a column "Buyer Info" containing buyer code, name, and email.
     Uses the same formatting as the original global Excel output (with hyperlinks).
     """
     buyer_str = f"{buyer_info.get('buyer_code','')} - {buyer_info.get('name','')} - {buyer_info.get('email','')}"
-    for rec in filtered_data:
-        rec["Buyer Info"] = buyer_str
-    df = pd.DataFrame(filtered_data)
+    columns = records_to_columns(filtered_data)
+    columns["Buyer Info"] = [buyer_str] * len(filtered_data)
+    df = pd.DataFrame(columns)
     with pd.ExcelWriter(file_path, engine="xlsxwriter") as writer:
         df.to_excel(writer, index=False, sheet_name="Product Details")
         workbook = writer.book
         worksheet = writer.sheets["Product Details"]
         # Add hyperlinks on the product name columns.
-        for row_num, row_data in enumerate(filtered_data, start=1):
-            if row_data["Praktis Name"]:
-                url = PRAKTIS_SEARCH_URL.format(row_data["Praktis Code"])
-                worksheet.write_url(row_num, 2, url, string=row_data["Praktis Name"])
-            if row_data["Praktiker Name"]:
-                url = PRAKTIKER_SEARCH_URL.format(row_data["Praktiker Code"])
-                worksheet.write_url(row_num, 3, url, string=row_data["Praktiker Name"])
+        for row_num, rec in enumerate(filtered_data, start=1):
+            if rec.praktis_name:
+                url = PRAKTIS_SEARCH_URL.format(rec.praktis_code)
+                worksheet.write_url(row_num, 2, url, string=rec.praktis_name)
+            if rec.praktiker_name:
+                url = PRAKTIKER_SEARCH_URL.format(rec.praktiker_code)
+                worksheet.write_url(row_num, 3, url, string=rec.praktiker_name)
         for col_num, col_name in enumerate(df.columns):
             max_length = max([len(str(val)) for val in df[col_name].fillna("")] + [len(col_name)])
             worksheet.set_column(col_num, col_num, max_length + 2, writer.book.add_format({'text_wrap': True}))
@@ -111,25 +123,25 @@ def write_filtered_excel(file_path, filtered_data, buyer_info):
 def format_email_body_table_html(filtered_changes, filtered_product_data):
     """
     Builds an HTML table (with columns: ID, Product name, My price, Their Price, Comp Change, Diff)
-    using the filtered_changes dictionary and filtered_product_data.
+    using the filtered_changes dictionary and filtered_product_data (ProductRecord objects).
     This version adds inline styles for alternating row backgrounds.
     """
     rows_html = ""
     # Build a lookup dictionary for product data keyed by (Praktis Code, Praktiker Code)
-    prod_dict = {(rec["Praktis Code"], rec["Praktiker Code"]): rec for rec in filtered_product_data}
+    prod_dict = {rec.key: rec for rec in filtered_product_data}
 
     row_index = 0  # To alternate row colors
 
     # Process records with price changes.
     for change in filtered_changes.get("price_changes", []):
         key = (change["code"], change["praktiker_code"])
-        rec = prod_dict.get(key, {})
+        rec = prod_dict.get(key)
         my_price = safe_float(change.get("praktis_new_price", 0))
         their_price = safe_float(change.get("praktiker_new_price", 0))
         comp_change = safe_float(change.get("praktiker_new_price", 0)) - safe_float(
             change.get("praktiker_old_price", 0))
         diff = their_price - my_price
-        name = rec.get("Praktis Name", "N/A")
+        name = rec.praktis_name if rec else "N/A"
         if diff < 0:
             diff_str = f"<span style='color:red;'>-{abs(diff):.2f}</span>"
         elif diff > 0:
@@ -154,12 +166,12 @@ def format_email_body_table_html(filtered_changes, filtered_product_data):
     # Process new items.
     for update in filtered_changes.get("new_items", []):
         key = (update["Praktis Code"], update["Praktiker Code"])
-        rec = prod_dict.get(key, {})
-        my_price = safe_float(rec.get("Praktis Regular Price", 0))
-        their_price = safe_float(rec.get("Praktiker Regular Price", 0))
+        rec = prod_dict.get(key)
+        my_price = safe_float(rec.praktis_regular_price if rec else 0)
+        their_price = safe_float(rec.praktiker_regular_price if rec else 0)
         comp_change = 0.0
         diff = their_price - my_price
-        name = rec.get("Praktis Name", "N/A")
+        name = rec.praktis_name if rec else "N/A"
         if diff < 0:
             diff_str = f"<span style='color:red;'>-{abs(diff):.2f}</span>"
         elif diff > 0:
@@ -224,7 +236,6 @@ def format_email_body_table_html(filtered_changes, filtered_product_data):
 def filter_product_data_by_buyer(product_data, buyer_code, buyer_mapping_dict):
     filtered = []
     for rec in product_data:
-        key = (rec["Praktis Code"], rec["Praktiker Code"])
-        if buyer_code in buyer_mapping_dict.get(key, []):
+        if buyer_code in buyer_mapping_dict.get(rec.key, []):
             filtered.append(rec)
     return filtered
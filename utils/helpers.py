@@ -1,5 +1,8 @@
 # utils/helpers.py
 
+import math
+from decimal import Decimal
+
 def safe_float(value):
     """
     Converts a string value to a float.
@@ -18,3 +21,41 @@ def safe_float(value):
         return float(value)
     except Exception:
         return 0.0
+
+def parse_price(value):
+    """
+    Converts a scraped price to a float.
+    - Removes all whitespace (e.g., "1 400,00").
+    - Treats the last "." or "," as the decimal separator and drops the others as
+      thousands separators (e.g., "1.400,00" or Praktiker's "1.400" + "." + "00").
+    - Returns None for missing values (None, "", "None", "N/A").
+    - Returns None and logs the value when a non-empty value cannot be converted
+      or is not a finite number.
+    """
+    if value is None:
+        return None
+    original = value
+    if isinstance(value, str):
+        value = ''.join(value.split())
+        if value == "" or value.upper() in ("N/A", "NONE"):
+            return None
+        sep = max(value.rfind("."), value.rfind(","))
+        if sep >= 0:
+            value = value[:sep].replace(".", "").replace(",", "") + "." + value[sep + 1:]
+    try:
+        price = float(value)
+    except Exception:
+        print(f"Could not parse price {original!r}")
+        return None
+    if not math.isfinite(price):
+        print(f"Could not parse price {original!r}")
+        return None
+    return price
+
+def price_decimal(value):
+    """
+    Converts a price (float, Decimal, legacy text or None) to a 2-place Decimal for binding and comparison.
+    Decimals keep their exact value when SQL Server converts them into legacy NVARCHAR price columns.
+    """
+    price = parse_price(value)
+    return None if price is None else Decimal(f"{price:.2f}")
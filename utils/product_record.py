@@ -0,0 +1,65 @@
+# utils/product_record.py
+
+from dataclasses import dataclass
+from typing import Optional
+from utils.helpers import parse_price
+
+# Attribute name -> column label used in the Excel output and serialized records.
+FIELD_LABELS = (
+    ("praktis_code", "Praktis Code"),
+    ("praktiker_code", "Praktiker Code"),
+    ("praktis_name", "Praktis Name"),
+    ("praktiker_name", "Praktiker Name"),
+    ("praktis_regular_price", "Praktis Regular Price"),
+    ("praktiker_regular_price", "Praktiker Regular Price"),
+    ("praktis_promo_price", "Praktis Promo Price"),
+    ("praktiker_promo_price", "Praktiker Promo Price"),
+)
+
+
+@dataclass(slots=True)
+class ProductRecord:
+    """
+    One scraped (Praktis, Praktiker) product pair.
+    Prices are floats, or None when the price is missing or could not be parsed.
+    """
+    praktis_code: str
+    praktiker_code: str
+    praktis_name: str
+    praktiker_name: str
+    praktis_regular_price: Optional[float]
+    praktiker_regular_price: Optional[float]
+    praktis_promo_price: Optional[float]
+    praktiker_promo_price: Optional[float]
+
+    @classmethod
+    def from_scraped(cls, pair, praktis_data, praktiker_data):
+        return cls(
+            praktis_code=str(pair["Praktis Code"]),
+            praktiker_code=str(pair["Praktiker Code"]),
+            praktis_name=str(praktis_data["name"]),
+            praktiker_name=str(praktiker_data["name"]),
+            praktis_regular_price=parse_price(praktis_data["regular_price"]),
+            praktiker_regular_price=parse_price(praktiker_data["regular_price"]),
+            praktis_promo_price=parse_price(praktis_data["promo_price"]),
+            praktiker_promo_price=parse_price(praktiker_data["promo_price"]),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{attr: data.get(label) for attr, label in FIELD_LABELS})
+
+    def to_dict(self):
+        return {label: getattr(self, attr) for attr, label in FIELD_LABELS}
+
+    @property
+    def key(self):
+        return (self.praktis_code, self.praktiker_code)
+
+
+def records_to_columns(records):
+    """
+    Returns a {column label: list of values} mapping for the given records,
+    suitable for building a DataFrame without an intermediate dict per row.
+    """
+    return {label: [getattr(rec, attr) for rec in records] for attr, label in FIELD_LABELS}
@@ -0,0 +1 @@
+# workqueue/__init__.py
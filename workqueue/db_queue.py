@@ -0,0 +1,335 @@
+# workqueue/db_queue.py
+
+import json
+import pyodbc
+from datetime import datetime
+from config import DB_CONNECTION_STRING, WORK_QUEUE_TABLE, WORK_RUN_TABLE, WORK_MAX_ATTEMPTS
+
+
+def _ensure_tables(cursor, table_name, run_table_name):
+    cursor.execute(f"""
+    IF NOT EXISTS (SELECT * FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = '{run_table_name}')
+    BEGIN
+        CREATE TABLE [{run_table_name}] (
+            [RunId] NVARCHAR(64) PRIMARY KEY,
+            [CreatedAt] DATETIME,
+            [Finalized] BIT NOT NULL DEFAULT 0,
+            [FinalizeOwner] NVARCHAR(255),
+            [FinalizeExpires] DATETIME
+        )
+    END
+    """)
+    cursor.execute(f"""
+    IF NOT EXISTS (SELECT * FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = '{table_name}')
+    BEGIN
+        CREATE TABLE [{table_name}] (
+            [RunId] NVARCHAR(64),
+            [Praktis Code] NVARCHAR(255),
+            [Praktiker Code] NVARCHAR(255),
+            [Status] NVARCHAR(16) NOT NULL,
+            [LeaseOwner] NVARCHAR(255),
+            [LeaseExpires] DATETIME,
+            [Attempts] INT NOT NULL DEFAULT 0,
+            [Result] NVARCHAR(MAX),
+            PRIMARY KEY ([RunId], [Praktis Code], [Praktiker Code])
+        )
+    END
+    """)
+
+
+def get_latest_open_run_id(table_name=WORK_QUEUE_TABLE, run_table_name=WORK_RUN_TABLE):
+    """
+    Returns the RunId of the most recently created run that has not been finalized yet,
+    or None if there is no open run.
+    """
+    conn = pyodbc.connect(DB_CONNECTION_STRING)
+    try:
+        cursor = conn.cursor()
+        _ensure_tables(cursor, table_name, run_table_name)
+        conn.commit()
+        cursor.execute(f"""
+            SELECT TOP 1 [RunId] FROM [{run_table_name}]
+            WHERE [Finalized] = 0
+            ORDER BY [CreatedAt] DESC
+        """)
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+class DbWorkQueue:
+    """
+    Lease-based work queue stored in SQL Server.
+
+    The coordinator enqueues product pairs for a run; any number of workers claim
+    batches of pending items under a time-limited lease, scrape them and store the
+    results back on the queue rows. Items whose lease expired (e.g. a worker crashed)
+    are handed out again on the next claim, up to max_attempts times before they are
+    marked failed. The final stage is claimed under a lease as well, and the run is only
+    marked finalized once that stage has completed. Lease expiry uses the database clock,
+    so workers on different machines do not need synchronized clocks.
+    """
+
+    def __init__(self, run_id, table_name=WORK_QUEUE_TABLE, run_table_name=WORK_RUN_TABLE,
+                 max_attempts=WORK_MAX_ATTEMPTS):
+        self.run_id = run_id
+        self.max_attempts = max_attempts
+        self.table_name = table_name
+        self.run_table_name = run_table_name
+
+    def _connect(self):
+        return pyodbc.connect(DB_CONNECTION_STRING)
+
+    def enqueue(self, product_pairs):
+        """
+        Creates the run and adds every product pair as a pending item.
+        Pairs that are already queued for this run are left untouched; enqueuing
+        into a finalized run raises ValueError. Returns the number of newly queued items.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            _ensure_tables(cursor, self.table_name, self.run_table_name)
+            cursor.execute(f"SELECT [Finalized] FROM [{self.run_table_name}] WITH (UPDLOCK, HOLDLOCK) WHERE [RunId] = ?",
+                           self.run_id)
+            row = cursor.fetchone()
+            if row and row[0]:
+                raise ValueError(f"Run {self.run_id} is already finalized")
+            cursor.execute(f"""
+                IF NOT EXISTS (SELECT 1 FROM [{self.run_table_name}] WHERE [RunId] = ?)
+                    INSERT INTO [{self.run_table_name}] ([RunId], [CreatedAt], [Finalized]) VALUES (?, ?, 0)
+            """, self.run_id, self.run_id, datetime.now())
+            added = 0
+            for pair in product_pairs:
+                cursor.execute(f"""
+                    IF NOT EXISTS (SELECT 1 FROM [{self.table_name}]
+                                   WHERE [RunId] = ? AND [Praktis Code] = ? AND [Praktiker Code] = ?)
+                        INSERT INTO [{self.table_name}] ([RunId], [Praktis Code], [Praktiker Code], [Status], [Attempts])
+                        VALUES (?, ?, ?, 'pending', 0)
+                """, self.run_id, pair["Praktis Code"], pair["Praktiker Code"],
+                    self.run_id, pair["Praktis Code"], pair["Praktiker Code"])
+                if cursor.rowcount > 0:
+                    added += 1
+            conn.commit()
+            return added
+        finally:
+            conn.close()
+
+    def claim_batch(self, worker_id, batch_size, lease_seconds):
+        """
+        Atomically leases up to batch_size items that are pending or whose lease has expired.
+        Expired items that already used max_attempts are marked failed instead.
+        Rows locked by a concurrent claim are skipped (READPAST), so workers never block each other.
+        Returns the claimed product pairs.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                UPDATE [{self.table_name}] WITH (ROWLOCK, READPAST)
+                SET [Status] = 'failed', [LeaseOwner] = NULL, [LeaseExpires] = NULL
+                WHERE [RunId] = ? AND [Status] = 'leased' AND [LeaseExpires] < GETDATE()
+                  AND [Attempts] >= ?
+            """, self.run_id, self.max_attempts)
+            cursor.execute(f"""
+                UPDATE TOP (?) [{self.table_name}] WITH (ROWLOCK, UPDLOCK, READPAST)
+                SET [Status] = 'leased',
+                    [LeaseOwner] = ?,
+                    [LeaseExpires] = DATEADD(second, ?, GETDATE()),
+                    [Attempts] = [Attempts] + 1
+                OUTPUT inserted.[Praktis Code], inserted.[Praktiker Code]
+                WHERE [RunId] = ?
+                  AND ([Status] = 'pending' OR ([Status] = 'leased' AND [LeaseExpires] < GETDATE()))
+            """, batch_size, worker_id, lease_seconds, self.run_id)
+            rows = cursor.fetchall()
+            conn.commit()
+            return [{"Praktis Code": row[0], "Praktiker Code": row[1]} for row in rows]
+        finally:
+            conn.close()
+
+    def complete(self, worker_id, results):
+        """
+        Stores the scraped results and marks the items as done.
+        Only items still leased by worker_id are updated; a result for an item whose lease
+        was reclaimed by another worker is discarded. Returns the number of accepted results.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            accepted = 0
+            for result in results:
+                cursor.execute(f"""
+                    UPDATE [{self.table_name}]
+                    SET [Status] = 'done', [Result] = ?, [LeaseOwner] = NULL, [LeaseExpires] = NULL
+                    WHERE [RunId] = ? AND [Praktis Code] = ? AND [Praktiker Code] = ?
+                      AND [Status] = 'leased' AND [LeaseOwner] = ?
+                """, json.dumps(result, ensure_ascii=False), self.run_id,
+                    result["Praktis Code"], result["Praktiker Code"], worker_id)
+                accepted += cursor.rowcount
+            conn.commit()
+            return accepted
+        finally:
+            conn.close()
+
+    def renew(self, worker_id, product_pairs, lease_seconds):
+        """
+        Extends the lease of items still leased by worker_id to lease_seconds from now.
+        Returns the number of renewed items; items whose lease was lost are skipped.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            renewed = 0
+            for pair in product_pairs:
+                cursor.execute(f"""
+                    UPDATE [{self.table_name}]
+                    SET [LeaseExpires] = DATEADD(second, ?, GETDATE())
+                    WHERE [RunId] = ? AND [Praktis Code] = ? AND [Praktiker Code] = ?
+                      AND [Status] = 'leased' AND [LeaseOwner] = ?
+                """, lease_seconds, self.run_id, pair["Praktis Code"], pair["Praktiker Code"], worker_id)
+                renewed += cursor.rowcount
+            conn.commit()
+            return renewed
+        finally:
+            conn.close()
+
+    def fail(self, worker_id, product_pairs):
+        """
+        Releases items still leased by worker_id that could not be scraped. Items that used
+        max_attempts are marked failed, the rest go back to pending. Returns the number marked failed.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            failed = 0
+            for pair in product_pairs:
+                cursor.execute(f"""
+                    UPDATE [{self.table_name}]
+                    SET [Status] = CASE WHEN [Attempts] >= ? THEN 'failed' ELSE 'pending' END,
+                        [LeaseOwner] = NULL, [LeaseExpires] = NULL
+                    OUTPUT inserted.[Status]
+                    WHERE [RunId] = ? AND [Praktis Code] = ? AND [Praktiker Code] = ?
+                      AND [Status] = 'leased' AND [LeaseOwner] = ?
+                """, self.max_attempts, self.run_id, pair["Praktis Code"], pair["Praktiker Code"], worker_id)
+                row = cursor.fetchone()
+                if row and row[0] == "failed":
+                    failed += 1
+            conn.commit()
+            return failed
+        finally:
+            conn.close()
+
+    def remaining(self):
+        """
+        Returns the number of items of this run that are neither done nor failed.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT COUNT(*) FROM [{self.table_name}]
+                WHERE [RunId] = ? AND [Status] NOT IN ('done', 'failed')
+            """, self.run_id)
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def failed_count(self):
+        """
+        Returns the number of items of this run that were given up on after max_attempts.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM [{self.table_name}] WHERE [RunId] = ? AND [Status] = 'failed'",
+                           self.run_id)
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def claim_finalize(self, worker_id, lease_seconds):
+        """
+        Leases the final stage of the run to worker_id if every item is done or failed, the run
+        is not finalized and nobody else holds an unexpired claim on it. Returns True if claimed.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                UPDATE [{self.run_table_name}]
+                SET [FinalizeOwner] = ?, [FinalizeExpires] = DATEADD(second, ?, GETDATE())
+                WHERE [RunId] = ? AND [Finalized] = 0
+                  AND ([FinalizeOwner] IS NULL OR [FinalizeExpires] < GETDATE())
+                  AND NOT EXISTS (SELECT 1 FROM [{self.table_name}]
+                                  WHERE [RunId] = ? AND [Status] NOT IN ('done', 'failed'))
+            """, worker_id, lease_seconds, self.run_id, self.run_id)
+            claimed = cursor.rowcount == 1
+            conn.commit()
+            return claimed
+        finally:
+            conn.close()
+
+    def renew_finalize(self, worker_id, lease_seconds):
+        """
+        Extends worker_id's claim on the final stage to lease_seconds from now.
+        Returns False if the claim was taken over by another worker.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                UPDATE [{self.run_table_name}]
+                SET [FinalizeExpires] = DATEADD(second, ?, GETDATE())
+                WHERE [RunId] = ? AND [Finalized] = 0 AND [FinalizeOwner] = ?
+            """, lease_seconds, self.run_id, worker_id)
+            renewed = cursor.rowcount == 1
+            conn.commit()
+            return renewed
+        finally:
+            conn.close()
+
+    def mark_finalized(self, worker_id):
+        """
+        Marks the run as finalized if worker_id still holds the final stage claim.
+        Returns False if the claim was taken over by another worker.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                UPDATE [{self.run_table_name}]
+                SET [Finalized] = 1
+                WHERE [RunId] = ? AND [FinalizeOwner] = ?
+            """, self.run_id, worker_id)
+            marked = cursor.rowcount == 1
+            conn.commit()
+            return marked
+        finally:
+            conn.close()
+
+    def is_finalized(self):
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT [Finalized] FROM [{self.run_table_name}] WHERE [RunId] = ?", self.run_id)
+            row = cursor.fetchone()
+            return bool(row and row[0])
+        finally:
+            conn.close()
+
+    def get_results(self):
+        """
+        Returns the scraped results of the run sorted by (Praktis Code, Praktiker Code).
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT [Result] FROM [{self.table_name}]
+                WHERE [RunId] = ? AND [Status] = 'done'
+            """, self.run_id)
+            results = [json.loads(row[0]) for row in cursor.fetchall()]
+            return sorted(results, key=lambda x: (x["Praktis Code"], x["Praktiker Code"]))
+        finally:
+            conn.close()
@@ -0,0 +1,288 @@
+# workqueue/file_queue.py
+
+import os
+import json
+import time
+from config import WORK_MAX_ATTEMPTS
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+
+class FileWorkQueue:
+    """
+    Lease-based work queue stored in a local JSON file.
+
+    Offers the same operations as DbWorkQueue so the coordinator and workers can be
+    exercised on one machine (tests, local runs) without SQL Server. The file holds a
+    single run; processes sharing it serialize access with an OS lock on "<path>.lock",
+    which is released automatically if the holder dies.
+    """
+
+    def __init__(self, path, run_id=None, max_attempts=WORK_MAX_ATTEMPTS, lock_timeout=30):
+        self.path = path
+        self.run_id = run_id
+        self.max_attempts = max_attempts
+        self.lock_path = path + ".lock"
+        self.lock_timeout = lock_timeout
+
+    def _acquire_lock(self):
+        lock_file = open(self.lock_path, "a+b")
+        deadline = time.time() + self.lock_timeout
+        while True:
+            try:
+                if msvcrt:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return lock_file
+            except OSError:
+                if time.time() > deadline:
+                    lock_file.close()
+                    raise TimeoutError(f"Could not lock work queue file '{self.path}'")
+                time.sleep(0.05)
+
+    def _release_lock(self, lock_file):
+        try:
+            if msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            lock_file.close()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save(self, state):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _checked_state(self, state):
+        if state is None:
+            raise ValueError(f"Work queue file '{self.path}' has no run; enqueue one first")
+        if self.run_id is not None and state["run_id"] != self.run_id:
+            raise ValueError(f"Work queue file '{self.path}' holds run {state['run_id']}, not {self.run_id}")
+        return state
+
+    def _read(self, func):
+        """
+        Runs func(state) under the file lock without saving and returns func's result.
+        """
+        lock_file = self._acquire_lock()
+        try:
+            return func(self._checked_state(self._load()))
+        finally:
+            self._release_lock(lock_file)
+
+    def _update(self, func):
+        """
+        Runs func(state) under the file lock, saves the state and returns func's result.
+        """
+        lock_file = self._acquire_lock()
+        try:
+            state = self._checked_state(self._load())
+            result = func(state)
+            self._save(state)
+            return result
+        finally:
+            self._release_lock(lock_file)
+
+    @staticmethod
+    def _key(pair):
+        return f"{pair['Praktis Code']}\t{pair['Praktiker Code']}"
+
+    def enqueue(self, product_pairs):
+        """
+        Adds every product pair as a pending item of run self.run_id. Pairs that are already
+        queued are left untouched. A finalized previous run in the file is replaced; enqueuing
+        into a finalized run, or over a different run that is still in progress, raises ValueError.
+        Returns the number of newly queued items.
+        """
+        if self.run_id is None:
+            raise ValueError("A run_id is required to enqueue work")
+        lock_file = self._acquire_lock()
+        try:
+            state = self._load()
+            if state is not None and state["run_id"] == self.run_id and state["finalized"]:
+                raise ValueError(f"Run {self.run_id} is already finalized")
+            if state is not None and state["run_id"] != self.run_id and not state["finalized"]:
+                raise ValueError(f"Run {state['run_id']} in '{self.path}' is still in progress")
+            if state is None or state["run_id"] != self.run_id:
+                state = {
+                    "run_id": self.run_id,
+                    "finalized": False,
+                    "finalize_owner": None,
+                    "finalize_expires": None,
+                    "items": {},
+                }
+            added = 0
+            for pair in product_pairs:
+                key = self._key(pair)
+                if key not in state["items"]:
+                    state["items"][key] = {
+                        "Praktis Code": pair["Praktis Code"],
+                        "Praktiker Code": pair["Praktiker Code"],
+                        "status": "pending",
+                        "lease_owner": None,
+                        "lease_expires": None,
+                        "attempts": 0,
+                        "result": None,
+                    }
+                    added += 1
+            self._save(state)
+            return added
+        finally:
+            self._release_lock(lock_file)
+
+    def claim_batch(self, worker_id, batch_size, lease_seconds):
+        """
+        Leases up to batch_size items that are pending or whose lease has expired.
+        Expired items that already used max_attempts are marked failed instead.
+        Returns the claimed product pairs.
+        """
+        def _claim(state):
+            now = time.time()
+            claimed = []
+            for item in state["items"].values():
+                expired = item["status"] == "leased" and item["lease_expires"] < now
+                if expired and item["attempts"] >= self.max_attempts:
+                    item["status"] = "failed"
+                    item["lease_owner"] = None
+                    item["lease_expires"] = None
+                    continue
+                if len(claimed) < batch_size and (item["status"] == "pending" or expired):
+                    item["status"] = "leased"
+                    item["lease_owner"] = worker_id
+                    item["lease_expires"] = now + lease_seconds
+                    item["attempts"] += 1
+                    claimed.append({"Praktis Code": item["Praktis Code"], "Praktiker Code": item["Praktiker Code"]})
+            return claimed
+        return self._update(_claim)
+
+    def complete(self, worker_id, results):
+        """
+        Stores the scraped results and marks the items as done.
+        Only items still leased by worker_id are updated. Returns the number of accepted results.
+        """
+        def _complete(state):
+            accepted = 0
+            for result in results:
+                item = state["items"].get(self._key(result))
+                if item and item["status"] == "leased" and item["lease_owner"] == worker_id:
+                    item["status"] = "done"
+                    item["lease_owner"] = None
+                    item["lease_expires"] = None
+                    item["result"] = result
+                    accepted += 1
+            return accepted
+        return self._update(_complete)
+
+    def renew(self, worker_id, product_pairs, lease_seconds):
+        """
+        Extends the lease of items still leased by worker_id to lease_seconds from now.
+        Returns the number of renewed items; items whose lease was lost are skipped.
+        """
+        def _renew(state):
+            now = time.time()
+            renewed = 0
+            for pair in product_pairs:
+                item = state["items"].get(self._key(pair))
+                if item and item["status"] == "leased" and item["lease_owner"] == worker_id:
+                    item["lease_expires"] = now + lease_seconds
+                    renewed += 1
+            return renewed
+        return self._update(_renew)
+
+    def fail(self, worker_id, product_pairs):
+        """
+        Releases items still leased by worker_id that could not be scraped. Items that used
+        max_attempts are marked failed, the rest go back to pending. Returns the number marked failed.
+        """
+        def _fail(state):
+            failed = 0
+            for pair in product_pairs:
+                item = state["items"].get(self._key(pair))
+                if item and item["status"] == "leased" and item["lease_owner"] == worker_id:
+                    item["status"] = "failed" if item["attempts"] >= self.max_attempts else "pending"
+                    item["lease_owner"] = None
+                    item["lease_expires"] = None
+                    failed += item["status"] == "failed"
+            return failed
+        return self._update(_fail)
+
+    def remaining(self):
+        """
+        Returns the number of items that are neither done nor failed.
+        """
+        return self._read(lambda state: sum(1 for item in state["items"].values()
+                                            if item["status"] not in ("done", "failed")))
+
+    def failed_count(self):
+        """
+        Returns the number of items that were given up on after max_attempts.
+        """
+        return self._read(lambda state: sum(1 for item in state["items"].values() if item["status"] == "failed"))
+
+    def claim_finalize(self, worker_id, lease_seconds):
+        """
+        Leases the final stage of the run to worker_id if every item is done or failed, the run
+        is not finalized and nobody else holds an unexpired claim on it. Returns True if claimed.
+        """
+        def _claim(state):
+            now = time.time()
+            if state["finalized"]:
+                return False
+            if state["finalize_owner"] is not None and state["finalize_expires"] >= now:
+                return False
+            if any(item["status"] not in ("done", "failed") for item in state["items"].values()):
+                return False
+            state["finalize_owner"] = worker_id
+            state["finalize_expires"] = now + lease_seconds
+            return True
+        return self._update(_claim)
+
+    def renew_finalize(self, worker_id, lease_seconds):
+        """
+        Extends worker_id's claim on the final stage to lease_seconds from now.
+        Returns False if the claim was taken over by another worker.
+        """
+        def _renew(state):
+            if state["finalized"] or state["finalize_owner"] != worker_id:
+                return False
+            state["finalize_expires"] = time.time() + lease_seconds
+            return True
+        return self._update(_renew)
+
+    def mark_finalized(self, worker_id):
+        """
+        Marks the run as finalized if worker_id still holds the final stage claim.
+        Returns False if the claim was taken over by another worker.
+        """
+        def _mark(state):
+            if state["finalize_owner"] != worker_id:
+                return False
+            state["finalized"] = True
+            return True
+        return self._update(_mark)
+
+    def is_finalized(self):
+        return self._read(lambda state: state["finalized"])
+
+    def get_results(self):
+        """
+        Returns the scraped results sorted by (Praktis Code, Praktiker Code).
+        """
+        results = self._read(lambda state: [item["result"] for item in state["items"].values()
+                                            if item["status"] == "done"])
+        return sorted(results, key=lambda x: (x["Praktis Code"], x["Praktiker Code"]))
@@ -0,0 +1,93 @@
+# workqueue/worker.py
+
+import os
+import time
+import socket
+import threading
+from contextlib import contextmanager
+from utils.excel_utils import scrape_product_pairs
+from utils.product_record import ProductRecord
+from config import WORK_BATCH_SIZE, WORK_LEASE_SECONDS, WORK_IDLE_SLEEP_SECONDS
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@contextmanager
+def keep_lease_alive(renew, interval):
+    """
+    Calls renew() every interval seconds in a background thread while the block runs,
+    so slow scrapes or a long final stage do not let the lease expire.
+    """
+    stop = threading.Event()
+
+    def _heartbeat():
+        while not stop.wait(interval):
+            try:
+                renew()
+            except Exception as e:
+                print(f"Failed to renew lease: {e}")
+
+    thread = threading.Thread(target=_heartbeat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_worker(queue, on_drained, worker_id=None, batch_size=WORK_BATCH_SIZE,
+               lease_seconds=WORK_LEASE_SECONDS, idle_sleep=WORK_IDLE_SLEEP_SECONDS):
+    """
+    Claims batches from the queue, scrapes them and writes the results back until no work is left.
+    Pairs that fail to scrape are handed back to the queue, which retries them up to its
+    max_attempts. While other workers still hold leases the worker waits and retries, so it can
+    pick up their items (or the final stage) if a lease expires. Once every item is done or
+    failed, the worker that claims the final stage calls on_drained(records) with the
+    ProductRecord objects of the whole run; the run is marked finalized only after it returns.
+    The leases on the claimed batch and on the final stage are renewed every third of
+    lease_seconds while the work runs.
+    """
+    worker_id = worker_id or default_worker_id()
+    renew_interval = lease_seconds / 3
+    while True:
+        pairs = queue.claim_batch(worker_id, batch_size, lease_seconds)
+        if pairs:
+            print(f"Worker {worker_id} claimed {len(pairs)} items.")
+            try:
+                with keep_lease_alive(lambda: queue.renew(worker_id, pairs, lease_seconds), renew_interval):
+                    results = scrape_product_pairs(pairs)
+            except Exception as e:
+                print(f"Worker {worker_id} failed to scrape batch: {e}")
+                queue.fail(worker_id, pairs)
+                continue
+            accepted = queue.complete(worker_id, [rec.to_dict() for rec in results])
+            if accepted < len(results):
+                print(f"Worker {worker_id}: {len(results) - accepted} results discarded (lease lost).")
+            scraped = {rec.key for rec in results}
+            unscraped = [pair for pair in pairs if (pair["Praktis Code"], pair["Praktiker Code"]) not in scraped]
+            if unscraped:
+                failed = queue.fail(worker_id, unscraped)
+                print(f"Worker {worker_id}: {len(unscraped)} items not scraped, {failed} of them failed for good.")
+            continue
+        if queue.remaining() > 0:
+            time.sleep(idle_sleep)
+            continue
+        if queue.claim_finalize(worker_id, lease_seconds):
+            failed = queue.failed_count()
+            print(f"Worker {worker_id}: all work items done, running final stage.")
+            if failed:
+                print(f"Worker {worker_id}: {failed} items failed after {queue.max_attempts} attempts "
+                      f"and are left out of this run.")
+            with keep_lease_alive(lambda: queue.renew_finalize(worker_id, lease_seconds), renew_interval):
+                on_drained([ProductRecord.from_dict(result) for result in queue.get_results()])
+            if not queue.mark_finalized(worker_id):
+                print(f"Worker {worker_id}: final stage claim was taken over by another worker.")
+            return
+        if queue.is_finalized():
+            print(f"Worker {worker_id}: no work left.")
+            return
+        # Another worker is running the final stage; take it over if its claim expires.
+        time.sleep(idle_sleep)